@@ -8,6 +8,8 @@ from src.llm_model import get_ollama_llm
 from src.embedding_model import get_ollama_embeddings # Needed for vector store connection
 from src.vector_store import get_chroma_vector_store
 from src.rag_chain import build_rag_chain
+from src.small_to_big_retriever import SmallToBigRetriever
+from src.retrieval_cache import CachedChromaRetriever, get_shared_retrieval_cache
 
 # --- Load Configuration (cached to run once) ---
 @st.cache_resource
@@ -23,6 +25,7 @@ config = load_application_config()
 app_name = config['app_name']
 ollama_config = config['ollama']
 vector_store_config = config['data_ingestion']['vector_store']
+chunking_config = config['data_ingestion']['chunking']
 rag_config = config['rag']
 
 # --- Streamlit UI Setup ---
@@ -37,12 +40,13 @@ with st.expander("Configuration Details (from config.yaml)"):
     st.markdown(f"- **ChromaDB Dir:** `{vector_store_config['persist_directory']}`")
     st.markdown(f"- **ChromaDB Collection:** `{vector_store_config['collection_name']}`")
     st.markdown(f"- **Retrieval K:** `{rag_config['retrieval_k']}`")
+    st.markdown(f"- **Chunking Strategy:** `{chunking_config.get('strategy', 'standard')}`")
     st.markdown(f"- **RAG Chain Type:** `{rag_config['chain_type']}`")
 
 
 # --- Initialize LLM, Embeddings, Vector Store, and RAG Chain (Cached for performance) ---
 @st.cache_resource
-def setup_rag_system(ollama_cfg, rag_cfg, vector_store_cfg):
+def setup_rag_system(ollama_cfg, rag_cfg, vector_store_cfg, chunking_cfg):
     """
     Sets up and caches the RAG system components: LLM, Embeddings, Vector Store, and RAG Chain.
     This function is cached to run only once per session or until inputs change.
@@ -75,7 +79,28 @@ def setup_rag_system(ollama_cfg, rag_cfg, vector_store_cfg):
     )
     
     # Get retriever from vector store
-    retriever = vector_db.as_retriever(search_kwargs={"k": rag_cfg['retrieval_k']})
+    retrieval_cache_cfg = rag_cfg.get('retrieval_cache', {})
+    if retrieval_cache_cfg.get('enabled', False):
+        # Repeated questions (retries, reruns, other users) skip the query embedding and vector search
+        retriever = CachedChromaRetriever(
+            vector_store=vector_db,
+            persist_directory=vector_store_cfg['persist_directory'],
+            cache=get_shared_retrieval_cache(
+                max_entries=retrieval_cache_cfg.get('max_entries', 1024),
+                ttl_seconds=retrieval_cache_cfg.get('ttl_seconds', 600)
+            ),
+            k=rag_cfg['retrieval_k']
+        )
+    else:
+        retriever = vector_db.as_retriever(search_kwargs={"k": rag_cfg['retrieval_k']})
+    if chunking_cfg.get('strategy', 'standard') == 'small_to_big':
+        # The index holds small child chunks; expand matches to their parent spans
+        retriever = SmallToBigRetriever(
+            child_retriever=retriever,
+            parent_store_directory=os.path.join(vector_store_cfg['persist_directory'], "parent_store"),
+            persist_directory=vector_store_cfg['persist_directory'],
+            context_chars=rag_cfg.get('small_to_big_context_chars', 300)
+        )
 
     # 4. Build RAG chain
     rag_chain = build_rag_chain(
@@ -89,7 +114,7 @@ def setup_rag_system(ollama_cfg, rag_cfg, vector_store_cfg):
 
 # Setup the RAG system (this will run once and be cached)
 try:
-    rag_chain = setup_rag_system(ollama_config, rag_config, vector_store_config)
+    rag_chain = setup_rag_system(ollama_config, rag_config, vector_store_config, chunking_config)
 except Exception as e:
     st.error(f"Failed to set up RAG system: {e}")
     st.stop()
@@ -132,10 +157,13 @@ if prompt := st.chat_input("Ask me about the loaded data..."):
                 sources_info = "\n\n**Sources:**\n"
                 for i, doc in enumerate(source_documents):
                     # Prefer 'source' or 'file_path' in metadata, otherwise show content snippet
-                    source_name = doc.metadata.get('source', doc.metadata.get('file_path', f"Document {i+1}"))
-                    page_number = doc.metadata.get('page', None)
-                    if page_number is not None:
-                        source_name += f" (Page: {page_number})"
+                    # Deduplicated chunks list every source they stand for (already formatted with pages)
+                    source_name = doc.metadata.get('duplicate_sources')
+                    if not source_name:
+                        source_name = doc.metadata.get('source', doc.metadata.get('file_path', f"Document {i+1}"))
+                        page_number = doc.metadata.get('page', None)
+                        if page_number is not None:
+                            source_name += f" (Page: {page_number})"
                     
                     sources_info += f"- {source_name}\n"
                     # Optionally, show a snippet of the source content in an expander
@@ -150,4 +178,12 @@ if prompt := st.chat_input("Ask me about the loaded data..."):
             st.error(final_response)
         
         # Add assistant's final response (including sources) to chat history
-        st.session_state.messages.append({"role": "assistant", "content": final_response})
\ No newline at end of file
+        st.session_state.messages.append({"role": "assistant", "content": final_response})
+
+# --- Retrieval Cache Metrics (shared by all sessions in this process; rendered last so this turn is counted) ---
+if rag_config.get('retrieval_cache', {}).get('enabled', False):
+    with st.sidebar.expander("Retrieval Cache"):
+        cache_stats = get_shared_retrieval_cache().stats()
+        st.markdown(f"- **Hit Rate:** `{cache_stats['hit_rate']:.1%}` ({cache_stats['hits']} hits / {cache_stats['misses']} misses)")
+        st.markdown(f"- **Entries:** `{cache_stats['size']}` / `{cache_stats['max_entries']}`")
+        st.markdown(f"- **Evictions / Expirations:** `{cache_stats['evictions']}` / `{cache_stats['expirations']}`")
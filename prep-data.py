@@ -5,9 +5,17 @@ import sys # For sys.exit()
 # Import all modular components
 from src.config_loader import load_config
 from src.document_loader import load_documents_from_sources
-from src.text_splitter import get_text_splitter
+from src.text_splitter import get_text_splitter, split_into_child_chunks
+from src.parent_store import ParentStore
+from src.deduplicator import deduplicate_chunks, estimate_index_savings
 from src.embedding_model import get_ollama_embeddings
-from src.vector_store import get_chroma_vector_store, add_documents_to_vector_store
+from src.vector_store import (
+    get_chroma_vector_store,
+    add_documents_to_vector_store,
+    add_child_chunks_to_vector_store,
+    get_directory_size,
+    write_index_version,
+)
 
 def prepare_data(clear_existing_db: bool = True):
     """
@@ -39,9 +47,11 @@ def prepare_data(clear_existing_db: bool = True):
     print(f"ChromaDB Persistence Directory: {vector_store_config['persist_directory']}")
     print(f"ChromaDB Collection Name: {vector_store_config['collection_name']}")
     print(f"Chunk Size: {chunking_config['chunk_size']}, Chunk Overlap: {chunking_config['chunk_overlap']}")
+    print(f"Chunking Strategy: {chunking_config.get('strategy', 'standard')}")
 
     # --- Full Refresh Logic ---
     persist_directory = vector_store_config['persist_directory']
+    index_size_before = get_directory_size(persist_directory)
     if clear_existing_db:
         if os.path.exists(persist_directory):
             print(f"Clearing existing ChromaDB at: {persist_directory}...")
@@ -57,9 +67,20 @@ def prepare_data(clear_existing_db: bool = True):
     else:
         print("Skipping existing ChromaDB clearing (incremental update assumed).") # Will just append if docs are new
 
+    # Website responses are cached per collection outside the store, so a full refresh can still
+    # revalidate pages and reuse unchanged bodies instead of downloading everything again
+    web_cache_dir = os.path.join(
+        data_ingestion_config.get('web_cache_directory', './web_cache'),
+        vector_store_config['collection_name']
+    )
+
     # 1. Load Documents
     try:
-        documents = load_documents_from_sources(data_ingestion_config['document_sources'])
+        documents = load_documents_from_sources(
+            data_ingestion_config['document_sources'],
+            incremental=not clear_existing_db, # Unchanged web pages are already indexed on incremental runs
+            web_cache_dir=web_cache_dir
+        )
         if not documents:
             print("No documents loaded. Please check 'document_sources' in config.yaml and ensure data paths are correct.")
             print("--- Data Preparation Aborted: No documents to process ---")
@@ -71,17 +92,47 @@ def prepare_data(clear_existing_db: bool = True):
 
     # 2. Split Documents
     try:
-        text_splitter = get_text_splitter(
-            chunk_size=chunking_config['chunk_size'],
-            chunk_overlap=chunking_config['chunk_overlap']
-        )
-        chunks = text_splitter.split_documents(documents)
-        print(f"Successfully split {len(documents)} documents into {len(chunks)} chunks.")
+        if chunking_config.get('strategy', 'standard') == 'small_to_big':
+            # Parents are stored once next to the ChromaDB data; only the small children are embedded
+            parent_store = ParentStore(os.path.join(persist_directory, "parent_store"))
+            chunks = split_into_child_chunks(
+                documents,
+                parent_store,
+                chunk_size=chunking_config['child_chunk_size'],
+                chunk_overlap=chunking_config['child_chunk_overlap']
+            )
+            print(f"Stored {len(parent_store)} parent documents ({parent_store.size_bytes() / 1024:.1f} KiB) "
+                  f"and split them into {len(chunks)} child chunks.")
+            parent_store.close()
+        else:
+            text_splitter = get_text_splitter(
+                chunk_size=chunking_config['chunk_size'],
+                chunk_overlap=chunking_config['chunk_overlap']
+            )
+            chunks = text_splitter.split_documents(documents)
+            print(f"Successfully split {len(documents)} documents into {len(chunks)} chunks.")
     except Exception as e:
         print(f"Failed to split documents: {e}")
         print("--- Data Preparation Aborted ---")
         sys.exit(1) # Exit if document splitting fails
 
+    # 2b. Remove Near-Duplicate Chunks (boilerplate repeated across pages/documents)
+    dedup_config = data_ingestion_config.get('deduplication', {})
+    dedup_stats = None
+    if dedup_config.get('enabled', False):
+        try:
+            chunks, dedup_stats = deduplicate_chunks(
+                chunks,
+                similarity_threshold=dedup_config.get('similarity_threshold', 0.95),
+                num_perm=dedup_config.get('num_perm', 128),
+                bands=dedup_config.get('bands', 16),
+                shingle_size=dedup_config.get('shingle_size', 5)
+            )
+        except Exception as e:
+            print(f"Failed to deduplicate chunks: {e}")
+            print("--- Data Preparation Aborted ---")
+            sys.exit(1) # Exit if deduplication fails
+
     # 3. Initialize Embedding Model
     try:
         embeddings = get_ollama_embeddings(
@@ -94,6 +145,16 @@ def prepare_data(clear_existing_db: bool = True):
         print("--- Data Preparation Aborted ---")
         sys.exit(1) # Exit if embedding model fails
 
+    if dedup_stats and dedup_stats['removed_chunks']:
+        try:
+            embedding_dimension = len(embeddings.embed_query("embedding dimension probe"))
+            savings = estimate_index_savings(dedup_stats, embedding_dimension)
+            print(f"Deduplication saved {savings['embeddings_saved']} embeddings "
+                  f"(~{savings['vector_bytes_saved'] / 1024:.1f} KiB of vectors only; "
+                  f"the measured index size is reported at the end).")
+        except Exception as e:
+            print(f"Could not estimate index savings from deduplication: {e}") # Reporting only; not fatal
+
     # 4. Initialize or Load ChromaDB and Add Documents
     try:
         vector_db = get_chroma_vector_store(
@@ -101,12 +162,22 @@ def prepare_data(clear_existing_db: bool = True):
             collection_name=vector_store_config['collection_name'],
             embedding_function=embeddings
         )
-        add_documents_to_vector_store(vector_db, chunks)
+        if chunking_config.get('strategy', 'standard') == 'small_to_big':
+            add_child_chunks_to_vector_store(vector_db, chunks)
+        else:
+            add_documents_to_vector_store(vector_db, chunks)
+        write_index_version(persist_directory) # Invalidates cached retrieval results in running apps
+        if os.path.isdir(web_cache_dir):
+            # Only now are this run's web pages indexed, so their validators may be used to skip them next time
+            from src.web_loader import commit_pending_responses
+            print(f"Committed {commit_pending_responses(web_cache_dir)} cached web responses.")
     except Exception as e:
         print(f"Failed to interact with vector store: {e}")
         print("--- Data Preparation Aborted ---")
         sys.exit(1) # Exit if vector store interaction fails
 
+    print(f"Index size: {index_size_before / 1024:.1f} KiB before, {get_directory_size(persist_directory) / 1024:.1f} KiB after "
+          f"(ChromaDB plus parent store).")
     print("--- Data Preparation Complete ---")
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+import hashlib
+import re
+from typing import List, Dict, Any, Tuple
+
+from langchain_core.documents import Document
+
+from src.text_utils import normalize_text
+
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def _numeric_tokens(text: str) -> Tuple[str, ...]:
+    """Returns the numbers in a (normalized) text in order, e.g. prices, quantities, dates."""
+    return tuple(re.findall(r"\d+(?:[.,]\d+)*", text))
+
+def _shingles(text: str, shingle_size: int) -> set:
+    """Returns the set of word n-gram shingles of a (normalized) text."""
+    words = text.split(" ")
+    if len(words) <= shingle_size:
+        return {text}
+    return {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+def _hash_shingle(shingle: str) -> int:
+    """Stable 32-bit hash of a shingle (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+
+def _permutations(num_perm: int, seed: int = 1) -> List[Tuple[int, int]]:
+    """Derives `num_perm` deterministic (a, b) pairs for the MinHash permutations."""
+    perms = []
+    for i in range(num_perm):
+        digest = hashlib.blake2b(f"{seed}:{i}".encode("utf-8"), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little") % (_MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "little") % _MERSENNE_PRIME
+        perms.append((a, b))
+    return perms
+
+def _minhash_signature(shingle_hashes: List[int], perms: List[Tuple[int, int]]) -> Tuple[int, ...]:
+    """Computes the MinHash signature of a set of shingle hashes."""
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in shingle_hashes)
+        for a, b in perms
+    )
+
+def _estimated_jaccard(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimates Jaccard similarity as the fraction of matching signature slots."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+def _source_reference(chunk: Document) -> str:
+    """Builds a human readable reference ('source (Page: n)') for a chunk."""
+    source_name = str(chunk.metadata.get('source', chunk.metadata.get('file_path', 'unknown')))
+    page_number = chunk.metadata.get('page', None)
+    if page_number is not None:
+        source_name += f" (Page: {page_number})"
+    return source_name
+
+def deduplicate_chunks(
+    chunks: List[Document],
+    similarity_threshold: float = 0.95,
+    num_perm: int = 128,
+    bands: int = 16,
+    shingle_size: int = 5
+) -> Tuple[List[Document], Dict[str, Any]]:
+    """
+    Removes near-duplicate chunks using MinHash with locality-sensitive hashing.
+
+    Chunks are only merged if their numbers (prices, quantities, dates) match exactly,
+    since a small textual difference in a number is a different fact, not boilerplate.
+    The first occurrence of each group of near-duplicates is kept. Its metadata gains
+    a 'duplicate_sources' entry listing every source reference of the group
+    (joined with '; ', since ChromaDB metadata values must be scalars) and a
+    'duplicate_count' entry with the number of chunks it stands for.
+
+    Args:
+        chunks (List[Document]): The chunks produced by the text splitter.
+        similarity_threshold (float): Minimum estimated Jaccard similarity of the word
+                                      shingles for two chunks to count as duplicates.
+        num_perm (int): Number of MinHash permutations (signature length).
+        bands (int): Number of LSH bands; must divide `num_perm`. More bands finds
+                     more candidate pairs at lower similarity.
+        shingle_size (int): Number of words per shingle.
+
+    Returns:
+        Tuple[List[Document], Dict[str, Any]]: The deduplicated chunks and a statistics
+                                               dictionary ('input_chunks', 'output_chunks',
+                                               'removed_chunks', 'removed_characters').
+    """
+    if num_perm % bands != 0:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands}).")
+    rows = num_perm // bands
+
+    print(f"Deduplicating {len(chunks)} chunks (threshold={similarity_threshold}, num_perm={num_perm}, bands={bands})...")
+    perms = _permutations(num_perm)
+    exact_index: Dict[str, int] = {} # normalized text digest -> position in `kept`
+    band_buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+    kept: List[Document] = []
+    kept_signatures: List[Tuple[int, ...]] = []
+    kept_sources: List[List[str]] = []
+    kept_numbers: List[Tuple[str, ...]] = []
+    removed_characters = 0
+
+    for chunk in chunks:
+        normalized = normalize_text(chunk.page_content)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+        # Fast path: exact duplicates after normalization need no signature
+        match = exact_index.get(digest)
+        signature = None
+        numbers = _numeric_tokens(normalized)
+        if match is None and normalized:
+            shingle_hashes = [_hash_shingle(s) for s in _shingles(normalized, shingle_size)]
+            signature = _minhash_signature(shingle_hashes, perms)
+            candidates = set()
+            for band, buckets in enumerate(band_buckets):
+                candidates.update(buckets.get(signature[band * rows:(band + 1) * rows], ()))
+            best_similarity = similarity_threshold
+            for candidate in sorted(candidates):
+                # Chunks differing only in a number (e.g. 499 vs 649 EUR) state different facts
+                if kept_numbers[candidate] != numbers:
+                    continue
+                similarity = _estimated_jaccard(signature, kept_signatures[candidate])
+                if similarity >= best_similarity:
+                    match, best_similarity = candidate, similarity
+
+        if match is not None:
+            reference = _source_reference(chunk)
+            if reference not in kept_sources[match]:
+                kept_sources[match].append(reference)
+            kept[match].metadata['duplicate_count'] += 1
+            removed_characters += len(chunk.page_content)
+            continue
+
+        position = len(kept)
+        representative = Document(
+            page_content=chunk.page_content,
+            metadata={**chunk.metadata, 'duplicate_count': 1}
+        )
+        kept.append(representative)
+        kept_sources.append([_source_reference(chunk)])
+        kept_signatures.append(signature or ())
+        kept_numbers.append(numbers)
+        exact_index[digest] = position
+        if signature:
+            for band, buckets in enumerate(band_buckets):
+                buckets.setdefault(signature[band * rows:(band + 1) * rows], []).append(position)
+
+    for representative, sources in zip(kept, kept_sources):
+        representative.metadata['duplicate_sources'] = "; ".join(sources)
+
+    stats = {
+        'input_chunks': len(chunks),
+        'output_chunks': len(kept),
+        'removed_chunks': len(chunks) - len(kept),
+        'removed_characters': removed_characters,
+    }
+    print(f"Deduplication kept {stats['output_chunks']} of {stats['input_chunks']} chunks "
+          f"({stats['removed_chunks']} near-duplicates removed).")
+    return kept, stats
+
+def estimate_index_savings(stats: Dict[str, Any], embedding_dimension: int) -> Dict[str, int]:
+    """
+    Estimates the vector storage deduplication saved. Text savings are not counted:
+    they depend on the chunking strategy (small-to-big children store no text), so the
+    measured before/after index size reported by prep-data.py is the overall figure.
+
+    Args:
+        stats (Dict[str, Any]): The statistics returned by `deduplicate_chunks`.
+        embedding_dimension (int): Dimension of the embedding vectors.
+
+    Returns:
+        Dict[str, int]: 'embeddings_saved' and 'vector_bytes_saved' (float32 vectors).
+    """
+    return {
+        'embeddings_saved': stats['removed_chunks'],
+        'vector_bytes_saved': stats['removed_chunks'] * embedding_dimension * 4,
+    }
+
+# Example usage (for testing)
+# Run from the project root with `python -m src.deduplicator` so `src` is importable.
+if __name__ == "__main__":
+    footer = ("Kernellix Ltd. All prices are in EUR and exclude VAT. Prices are subject to change "
+              "without notice. Please contact sales for volume discounts and custom agreements.")
+    sample_chunks = [
+        Document(page_content="Managed Kubernetes cluster, 3 nodes, 24/7 support.", metadata={"source": "a.pdf", "page": 0}),
+        Document(page_content=footer, metadata={"source": "a.pdf", "page": 0}),
+        Document(page_content=footer.upper(), metadata={"source": "a.pdf", "page": 1}),
+        Document(page_content=footer.replace("custom agreements", "custom agreements!"), metadata={"source": "b.pdf", "page": 3}),
+        Document(page_content="Object storage, billed per GB per month.", metadata={"source": "b.pdf", "page": 4}),
+        Document(page_content="Managed Kubernetes cluster, 3 nodes, 24/7 support. Price: 499 EUR per month.",
+                 metadata={"source": "pricelist-2025.pdf", "page": 1}),
+        Document(page_content="Managed Kubernetes cluster, 3 nodes, 24/7 support. Price: 649 EUR per month.",
+                 metadata={"source": "pricelist-2026.pdf", "page": 1}),
+    ]
+
+    unique_chunks, dedup_stats = deduplicate_chunks(sample_chunks, similarity_threshold=0.85)
+    assert dedup_stats['removed_chunks'] == 2 # The footer variants only
+    assert any("649 EUR" in chunk.page_content for chunk in unique_chunks) # Different prices are kept apart
+    print(f"\nStats: {dedup_stats}")
+    print(f"Estimated savings (1024-dim embeddings): {estimate_index_savings(dedup_stats, 1024)}")
+    for i, chunk in enumerate(unique_chunks):
+        print(f"\n--- Chunk {i+1} ---")
+        print(chunk.page_content)
+        print(f"Metadata: {chunk.metadata}")
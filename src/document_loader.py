@@ -4,13 +4,16 @@ from typing import List, Dict, Any
 from langchain_community.document_loaders import (
     PyPDFLoader,
     CSVLoader,
-    WebBaseLoader,
     DirectoryLoader, # To load from directories
     TextLoader, # For plain text files
 )
 from langchain_core.documents import Document
 
-def load_documents_from_sources(sources_config: List[Dict[str, Any]]) -> List[Document]:
+def load_documents_from_sources(
+    sources_config: List[Dict[str, Any]],
+    incremental: bool = False,
+    web_cache_dir: str = "./web_cache"
+) -> List[Document]:
     """
     Loads documents from various configured sources.
 
@@ -18,6 +21,12 @@ def load_documents_from_sources(sources_config: List[Dict[str, Any]]) -> List[Do
         sources_config (List[Dict[str, Any]]): A list of dictionaries,
                                                 each describing a document source
                                                 as defined in config.yaml.
+        incremental (bool): If True, web pages that are unchanged since the last
+                            ingest (per their cached ETag/Last-Modified) are skipped,
+                            since they are already in the vector store. Otherwise
+                            (full refresh) unchanged pages are served from the cache.
+        web_cache_dir (str): Response cache for website sources. It belongs to one
+                             vector store collection; see `commit_pending_responses`.
 
     Returns:
         List[Document]: A list of loaded LangChain Document objects.
@@ -53,8 +62,15 @@ def load_documents_from_sources(sources_config: List[Dict[str, Any]]) -> List[Do
 
             elif source_type == "website" and source_urls:
                 print(f"  Loading documents from websites: {source_urls}")
-                loader = WebBaseLoader(web_paths=source_urls)
-                all_documents.extend(loader.load())
+                from src.web_loader import CachedAsyncWebLoader # Imported here so aiohttp is only needed for websites
+                loader = CachedAsyncWebLoader(
+                    urls=source_urls,
+                    cache_dir=web_cache_dir,
+                    max_concurrency=source.get('max_concurrency', 8),
+                    requests_per_second_per_host=source.get('requests_per_second_per_host', 2.0),
+                    skip_unchanged=incremental
+                )
+                all_documents.extend(loader.lazy_load()) # Pages are parsed while the remaining fetches run
 
             elif source_type == "text" and source_path: # Added support for plain text files
                 if os.path.isdir(source_path):
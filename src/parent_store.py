@@ -0,0 +1,193 @@
+import hashlib
+import json
+import mmap
+import os
+from typing import Dict, List, Optional
+
+# For non-ASCII parents, the byte offset of every CHECKPOINT_CHARS-th character is
+# recorded so a character span can be decoded without reading the whole parent.
+CHECKPOINT_CHARS = 256
+
+class ParentStore:
+    """
+    Stores each parent document's text exactly once in a single UTF-8 file that is
+    read through a memory map and addressed by character offsets.
+
+    Layout inside `directory`:
+        parents.txt         Concatenated UTF-8 text of all parents.
+        parents_index.json  parent_id -> [byte_offset, byte_length, char_length, checkpoints]
+                            where `checkpoints` is null for pure-ASCII parents.
+    """
+
+    TEXT_FILE = "parents.txt"
+    INDEX_FILE = "parents_index.json"
+
+    def __init__(self, directory: str):
+        """
+        Opens (or creates) a parent store.
+
+        Args:
+            directory (str): Directory holding the store files.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.text_path = os.path.join(directory, self.TEXT_FILE)
+        self.index_path = os.path.join(directory, self.INDEX_FILE)
+        self._index: Dict[str, list] = {}
+        if os.path.isfile(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+
+    @staticmethod
+    def make_parent_id(text: str, metadata: dict) -> str:
+        """Deterministic ID so re-ingesting the same parent does not store it twice."""
+        key = f"{metadata.get('source', '')}\x00{metadata.get('page', '')}\x00{text}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def add(self, text: str, metadata: Optional[dict] = None) -> str:
+        """
+        Appends a parent document's text to the store (once per ID).
+
+        Args:
+            text (str): The full parent text.
+            metadata (Optional[dict]): Parent metadata; 'source' and 'page' feed the ID.
+
+        Returns:
+            str: The parent ID to reference from child chunks.
+        """
+        parent_id = self.make_parent_id(text, metadata or {})
+        if parent_id in self._index:
+            return parent_id
+
+        encoded = text.encode("utf-8")
+        checkpoints = None
+        if len(encoded) != len(text):
+            checkpoints, byte_position = [], 0
+            for i in range(0, len(text), CHECKPOINT_CHARS):
+                checkpoints.append(byte_position)
+                byte_position += len(text[i:i + CHECKPOINT_CHARS].encode("utf-8"))
+
+        with open(self.text_path, "ab") as f:
+            offset = f.tell()
+            f.write(encoded)
+        self._index[parent_id] = [offset, len(encoded), len(text), checkpoints]
+        return parent_id
+
+    def save(self):
+        """Persists the index. Call after adding parents."""
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    def __contains__(self, parent_id: str) -> bool:
+        return parent_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def parent_length(self, parent_id: str) -> int:
+        """Returns the length of a parent in characters."""
+        return self._index[parent_id][2]
+
+    def size_bytes(self) -> int:
+        """Returns the on-disk size of the stored text."""
+        return os.path.getsize(self.text_path) if os.path.isfile(self.text_path) else 0
+
+    def _buffer(self, required_size: int) -> mmap.mmap:
+        """Returns a read-only map of the text file, remapping if it has grown."""
+        if self._mmap is None or self._mapped_size < required_size:
+            self.close()
+            with open(self.text_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = len(self._mmap)
+        return self._mmap
+
+    def get_span(self, parent_id: str, start: int, end: int) -> str:
+        """
+        Returns characters [start, end) of a parent, clamped to its bounds.
+
+        Args:
+            parent_id (str): The parent ID.
+            start (int): Start character offset.
+            end (int): End character offset (exclusive).
+
+        Returns:
+            str: The requested text.
+        """
+        offset, byte_length, char_length, checkpoints = self._index[parent_id]
+        start, end = max(0, start), min(char_length, end)
+        if start >= end:
+            return ""
+        buffer = self._buffer(offset + byte_length)
+        if checkpoints is None:
+            return buffer[offset + start:offset + end].decode("ascii")
+
+        first = start // CHECKPOINT_CHARS
+        last = -(-end // CHECKPOINT_CHARS) # Checkpoint at or after `end`
+        byte_start = offset + checkpoints[first]
+        byte_end = offset + (checkpoints[last] if last < len(checkpoints) else byte_length)
+        text = buffer[byte_start:byte_end].decode("utf-8")
+        base = first * CHECKPOINT_CHARS
+        return text[start - base:end - base]
+
+    def get(self, parent_id: str) -> str:
+        """Returns the full text of a parent."""
+        return self.get_span(parent_id, 0, self.parent_length(parent_id))
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._mapped_size = 0
+
+def merge_spans(spans: List[List[int]]) -> List[List[int]]:
+    """
+    Merges overlapping or touching [start, end) spans, keeping the order in which
+    each merged span first appeared.
+
+    Args:
+        spans (List[List[int]]): Spans in rank order.
+
+    Returns:
+        List[List[int]]: The merged spans.
+    """
+    merged: List[List[int]] = []
+    for start, end in spans:
+        overlapping = [m for m in merged if start <= m[1] and m[0] <= end]
+        if not overlapping:
+            merged.append([start, end])
+            continue
+        target = overlapping[0]
+        target[0] = min([start] + [m[0] for m in overlapping])
+        target[1] = max([end] + [m[1] for m in overlapping])
+        absorbed = {id(m) for m in overlapping[1:]}
+        merged = [m for m in merged if id(m) not in absorbed]
+    return merged
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    store_dir = tempfile.mkdtemp(prefix="parent_store_")
+    try:
+        store = ParentStore(store_dir)
+        ascii_id = store.add("The quick brown fox jumps over the lazy dog.", {"source": "a.txt"})
+        unicode_text = "Preisliste für Kunden – " * 40 + "Ende."
+        unicode_id = store.add(unicode_text, {"source": "b.pdf", "page": 2})
+        assert store.add(unicode_text, {"source": "b.pdf", "page": 2}) == unicode_id # Stored once
+        store.save()
+
+        reopened = ParentStore(store_dir)
+        print(f"Parents stored: {len(reopened)}, text bytes: {reopened.size_bytes()}")
+        print(f"ASCII span [4, 19): '{reopened.get_span(ascii_id, 4, 19)}'")
+        print(f"Unicode span [250, 300): '{reopened.get_span(unicode_id, 250, 300)}'")
+        assert reopened.get_span(unicode_id, 250, 300) == unicode_text[250:300]
+        assert reopened.get(unicode_id) == unicode_text
+        print(f"Merged spans: {merge_spans([[100, 200], [500, 600], [180, 300], [0, 50]])}")
+        reopened.close()
+    finally:
+        shutil.rmtree(store_dir)
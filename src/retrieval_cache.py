@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from src.text_utils import normalize_text
+from src.vector_store import get_index_version
+
+class RetrievalCache:
+    """
+    Thread-safe LRU cache with a time-to-live, recording hit-rate metrics.
+
+    Values are (chunk_ids, scores) tuples; documents themselves are re-read from
+    the vector store on a hit so the cache stays small.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600.0):
+        """
+        Args:
+            max_entries (int): Maximum number of cached queries; least recently used
+                               entries are evicted beyond this.
+            ttl_seconds (float): Seconds an entry stays valid (0 disables expiry).
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value for `key`, or None (counted as a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Stores `value` under `key`, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """
+        Drops a stale entry just returned by `get` (e.g. its chunks no longer exist)
+        and reclassifies that lookup as a miss, so the hit rate stays honest.
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._hits -= 1
+                self._misses += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit-rate metrics and the current size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+            }
+
+_shared_cache: Optional[RetrievalCache] = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_retrieval_cache(max_entries: int = 1024, ttl_seconds: float = 600.0) -> RetrievalCache:
+    """
+    Returns the process-wide retrieval cache, creating it on first use.
+
+    All Streamlit sessions in a process share this instance. The size and TTL
+    passed on the first call win.
+
+    Args:
+        max_entries (int): Maximum number of cached queries.
+        ttl_seconds (float): Seconds an entry stays valid.
+
+    Returns:
+        RetrievalCache: The shared cache.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            print(f"Initializing shared retrieval cache (max_entries={max_entries}, ttl_seconds={ttl_seconds})")
+            _shared_cache = RetrievalCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        return _shared_cache
+
+class CachedChromaRetriever(BaseRetriever):
+    """
+    Similarity-search retriever over a Chroma store that caches results.
+
+    The cache key is (normalized query, k, index version), so a re-ingest by
+    prep-data.py invalidates old entries. On a hit, neither the query embedding
+    nor the vector search is repeated; the chunks are fetched by ID. Each returned
+    document carries its query distance in metadata['distance'] (lower is closer).
+    """
+
+    vector_store: Any
+    """The Chroma vector store to search."""
+    persist_directory: str
+    """ChromaDB persistence directory, used to read the index version."""
+    cache: RetrievalCache
+    """Cache of query -> (chunk IDs, distances)."""
+    k: int = 5
+    """Number of chunks to retrieve."""
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        key = (normalize_text(query), self.k, get_index_version(self.persist_directory))
+        cached = self.cache.get(key)
+        if cached is not None:
+            documents = self._get_by_ids(*cached)
+            if documents is not None:
+                return documents
+            self.cache.invalidate(key) # Chunks vanished without a version bump; search again
+
+        query_embedding = self.vector_store.embeddings.embed_query(query)
+        # The public similarity_search* methods don't return chunk IDs, which the cache stores,
+        # so this one call queries the underlying collection directly.
+        results = self.vector_store._collection.query(
+            query_embeddings=[query_embedding],
+            n_results=self.k,
+            include=["documents", "metadatas", "distances"]
+        )
+        ids, distances = results["ids"][0], results["distances"][0]
+        self.cache.put(key, (tuple(ids), tuple(distances)))
+        return [
+            Document(page_content=text, metadata={**(metadata or {}), 'distance': distance})
+            for text, metadata, distance in zip(results["documents"][0], results["metadatas"][0], distances)
+        ]
+
+    def _get_by_ids(self, ids: Tuple[str, ...], distances: Tuple[float, ...]) -> Optional[List[Document]]:
+        """
+        Fetches cached chunks in their original rank order, with their cached distance
+        in metadata['distance'] as on a miss; None if any chunk is missing.
+        """
+        if not ids:
+            return []
+        results = self.vector_store.get(ids=list(ids), include=["documents", "metadatas"])
+        found = {
+            chunk_id: (text, metadata or {})
+            for chunk_id, text, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+        if len(found) != len(ids):
+            return None
+        return [
+            Document(page_content=found[chunk_id][0], metadata={**found[chunk_id][1], 'distance': distance})
+            for chunk_id, distance in zip(ids, distances)
+        ]
+
+# Example usage (for testing)
+# Run from the project root with `python -m src.retrieval_cache` so `src` is importable.
+if __name__ == "__main__":
+    cache = RetrievalCache(max_entries=2, ttl_seconds=0.5)
+    key_a = (normalize_text("What does  the Kubernetes plan cost?"), 5, "v1")
+    key_b = (normalize_text("what does the kubernetes plan cost?"), 5, "v1")
+    print(f"Normalized keys equal: {key_a == key_b}")
+
+    cache.put(key_a, (("chunk-1", "chunk-2"), (0.12, 0.34)))
+    print(f"Lookup (hit): {cache.get(key_b)}")
+    print(f"Lookup with new index version (miss): {cache.get((key_a[0], 5, 'v2'))}")
+    cache.get(key_a)
+    cache.invalidate(key_a) # e.g. its chunks were deleted; the lookup above now counts as a miss
+    cache.put(key_a, (("chunk-1", "chunk-2"), (0.12, 0.34)))
+    cache.put(("q2", 5, "v1"), ((), ()))
+    cache.put(("q3", 5, "v1"), ((), ()))
+    print(f"Lookup after eviction (miss): {cache.get(key_a)}")
+    time.sleep(0.6)
+    print(f"Lookup after TTL (miss): {cache.get(('q3', 5, 'v1'))}")
+    print(f"Stats: {cache.stats()}")
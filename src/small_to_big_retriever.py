@@ -0,0 +1,93 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from src.parent_store import ParentStore, merge_spans
+from src.vector_store import get_index_version
+
+class SmallToBigRetriever(BaseRetriever):
+    """
+    Matches queries against small child chunks, then expands each match to a window
+    of its parent document read from the ParentStore.
+
+    Children are stored in ChromaDB without text; their content comes from the
+    parent's character offsets. Windows from the same parent that overlap are merged,
+    so text shared by several matched children is returned (and sent to the LLM) only once.
+    The parent store is reopened whenever prep-data.py records a new index version.
+    """
+
+    child_retriever: BaseRetriever
+    """Retriever over the child chunk index (e.g. `vector_db.as_retriever(...)`)."""
+    parent_store_directory: str
+    """Directory of the ParentStore written by prep-data.py."""
+    persist_directory: str
+    """ChromaDB persistence directory, used to read the index version."""
+    context_chars: int = 300
+    """Characters of parent text added on each side of a matched child."""
+
+    _parent_store: Optional[ParentStore] = PrivateAttr(default=None)
+    _store_version: Optional[str] = PrivateAttr(default=None)
+    _store_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def _current_parent_store(self) -> ParentStore:
+        """Returns the parent store matching the current index, reopening it after a re-ingest."""
+        version = get_index_version(self.persist_directory)
+        with self._store_lock:
+            if self._parent_store is None or version != self._store_version:
+                # The old store is not closed here: another session may still be reading from its
+                # map, which stays valid (with the old offsets) until it is garbage collected.
+                self._parent_store = ParentStore(self.parent_store_directory)
+                self._store_version = version
+            return self._parent_store
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        children = self.child_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        parent_store = self._current_parent_store()
+
+        # Collect windows per parent in rank order; children without offsets pass through unchanged
+        ranked: List[Any] = []
+        windows: Dict[str, List[List[int]]] = {}
+        parent_metadata: Dict[str, dict] = {}
+        for child in children:
+            parent_id = child.metadata.get('parent_id')
+            if parent_id is None:
+                ranked.append(child)
+                continue
+            if parent_id not in parent_store:
+                continue # Stale child from before a re-ingest; it has no text of its own
+            if parent_id not in windows:
+                ranked.append(parent_id)
+                windows[parent_id] = []
+                parent_metadata[parent_id] = child.metadata
+            windows[parent_id].append([
+                max(0, child.metadata['start_index'] - self.context_chars),
+                min(parent_store.parent_length(parent_id), child.metadata['end_index'] + self.context_chars),
+            ])
+
+        documents = []
+        for entry in ranked:
+            if isinstance(entry, Document):
+                documents.append(entry)
+                continue
+            metadata = {
+                key: value for key, value in parent_metadata[entry].items()
+                if key not in ('start_index', 'end_index')
+            }
+            for start, end in merge_spans(windows[entry]):
+                documents.append(Document(
+                    page_content=parent_store.get_span(entry, start, end),
+                    metadata={**metadata, 'span_start': start, 'span_end': end}
+                ))
+        return documents
+
+# Example usage (for testing - highly simplified as it needs a live vector store)
+# Run from the project root with `python -m src.small_to_big_retriever` so `src` is importable.
+if __name__ == "__main__":
+    print("This module is primarily for integration. A full test requires a vector store built by prep-data.py")
+    print("with `chunking.strategy: small_to_big` in config.yaml. See src/parent_store.py for a standalone example.")
@@ -1,14 +1,19 @@
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from typing import List
+from typing import List, TYPE_CHECKING
 
-def get_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+if TYPE_CHECKING: # Type hint only; keeps `python src/text_splitter.py` runnable
+    from src.parent_store import ParentStore
+
+def get_text_splitter(chunk_size: int, chunk_overlap: int, add_start_index: bool = False) -> RecursiveCharacterTextSplitter:
     """
     Returns a configured RecursiveCharacterTextSplitter.
 
     Args:
         chunk_size (int): The maximum size of each chunk.
         chunk_overlap (int): The number of characters to overlap between chunks.
+        add_start_index (bool): If True, each chunk's metadata records its
+                                character offset ('start_index') in the source document.
 
     Returns:
         RecursiveCharacterTextSplitter: An instance of the text splitter.
@@ -17,11 +22,47 @@ def get_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacter
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
+        add_start_index=add_start_index,
         # Default separators are usually good: ["\n\n", "\n", " ", ""]
         # You can customize them if your documents have specific structural breaks
     )
     return text_splitter
 
+def split_into_child_chunks(
+    documents: List[Document],
+    parent_store: "ParentStore",
+    chunk_size: int,
+    chunk_overlap: int
+) -> List[Document]:
+    """
+    Stores each document once in the parent store and splits it into small child
+    chunks for indexing ("small-to-big" retrieval).
+
+    Each child's metadata gains 'parent_id', 'start_index' and 'end_index' (character
+    offsets into the parent) so it can be expanded back to its parent span at query time.
+
+    Args:
+        documents (List[Document]): The loaded (parent) documents.
+        parent_store (ParentStore): Store receiving the parent texts.
+        chunk_size (int): The maximum size of each child chunk.
+        chunk_overlap (int): The number of characters to overlap between child chunks.
+
+    Returns:
+        List[Document]: The child chunks.
+    """
+    splitter = get_text_splitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True)
+    children = []
+    for document in documents:
+        parent_id = parent_store.add(document.page_content, document.metadata)
+        for child in splitter.split_documents([document]):
+            start_index = child.metadata.get('start_index', -1)
+            if start_index >= 0: # -1 means the splitter could not locate the chunk; it is used as-is
+                child.metadata['parent_id'] = parent_id
+                child.metadata['end_index'] = start_index + len(child.page_content)
+            children.append(child)
+    parent_store.save()
+    return children
+
 # Example usage (for testing)
 if __name__ == "__main__":
     sample_text = """
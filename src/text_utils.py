@@ -0,0 +1,22 @@
+import re
+import unicodedata
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes text (NFKC, case-folded, whitespace collapsed) so formatting-only
+    differences don't matter, e.g. for near-duplicate detection or cache keys.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return re.sub(r"\s+", " ", text).strip()
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    sample = "  What does the\tKubernetes  plan COST?\n"
+    print(f"Original: {sample!r}")
+    print(f"Normalized: {normalize_text(sample)!r}")
@@ -1,4 +1,6 @@
 import os
+import time
+import uuid
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import OllamaEmbeddings # For type hinting/consistency
 from langchain_core.documents import Document
@@ -65,6 +67,93 @@ def add_documents_to_vector_store(
         print(f"Error adding documents to vector store: {e}")
         raise
 
+def add_child_chunks_to_vector_store(
+    vector_store: Chroma,
+    children: List[Document],
+    batch_size: int = 1000
+):
+    """
+    Adds small-to-big child chunks, embedding their text but storing no text for
+    children that point into the parent store (their text is rebuilt from the
+    parent's character offsets at query time, so it is stored only once).
+
+    Args:
+        vector_store (Chroma): The ChromaDB instance.
+        children (List[Document]): Child chunks from `split_into_child_chunks`.
+        batch_size (int): Number of children embedded and written per batch.
+    """
+    if not children:
+        print("No documents to add to the vector store.")
+        return
+
+    print(f"Adding {len(children)} child chunks to the vector store (text kept in the parent store)...")
+    try:
+        for i in range(0, len(children), batch_size):
+            batch = children[i:i + batch_size]
+            embeddings = vector_store.embeddings.embed_documents([child.page_content for child in batch])
+            # Chroma.add_texts always stores the embedded text, so the collection is written
+            # directly to embed the child text while storing an empty document in its place.
+            vector_store._collection.add(
+                ids=[str(uuid.uuid4()) for _ in batch],
+                embeddings=embeddings,
+                metadatas=[child.metadata for child in batch],
+                documents=["" if 'parent_id' in child.metadata else child.page_content for child in batch]
+            )
+        print(f"Successfully added {len(children)} child chunks to vector store.")
+    except Exception as e:
+        print(f"Error adding child chunks to vector store: {e}")
+        raise
+
+def get_directory_size(path: str) -> int:
+    """
+    Returns the total size in bytes of all files under `path` (0 if it does not exist).
+
+    Args:
+        path (str): The directory to measure, e.g. the ChromaDB persistence directory.
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass # File removed while walking
+    return total
+
+INDEX_VERSION_FILE = "index_version"
+
+def write_index_version(persist_directory: str) -> str:
+    """
+    Records a new index version after the vector store contents change.
+    Caches keyed by the index version (e.g. the retrieval cache) treat older entries as stale.
+
+    Args:
+        persist_directory (str): The ChromaDB persistence directory.
+
+    Returns:
+        str: The new index version.
+    """
+    version = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+    version_path = os.path.join(persist_directory, INDEX_VERSION_FILE)
+    with open(version_path + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(version_path + ".tmp", version_path)
+    print(f"Index version set to: {version}")
+    return version
+
+def get_index_version(persist_directory: str) -> str:
+    """
+    Returns the current index version, or an empty string if none was recorded.
+
+    Args:
+        persist_directory (str): The ChromaDB persistence directory.
+    """
+    try:
+        with open(os.path.join(persist_directory, INDEX_VERSION_FILE), "r") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
 # Example usage (for testing)
 if __name__ == "__main__":
     # This test requires Ollama running and 'nomic-embed-text' pulled
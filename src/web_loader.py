@@ -0,0 +1,344 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from bs4 import BeautifulSoup
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+_DONE = object() # Sentinel marking the end of the fetch stream
+
+class _ResponseCache:
+    """
+    On-disk cache of fetched pages plus the validators (ETag/Last-Modified) needed to revalidate them.
+
+    Newly fetched responses are written as *pending* entries and only become the
+    committed entry (the one whose validators are sent) once `commit_pending_responses`
+    is called after indexing succeeded. A run that dies before indexing therefore never
+    leaves validators that would make the next incremental run skip unindexed pages.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url: str, pending: bool = False) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        suffix = ".pending" if pending else ""
+        return (os.path.join(self.cache_dir, f"{key}{suffix}.json"),
+                os.path.join(self.cache_dir, f"{key}{suffix}.html"))
+
+    def get(self, url: str) -> Tuple[Optional[dict], Optional[str]]:
+        """Returns the committed (meta, body) for `url`, or (None, None)."""
+        meta_path, body_path = self._paths(url)
+        if not (os.path.isfile(meta_path) and os.path.isfile(body_path)):
+            return None, None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "r", encoding="utf-8") as f:
+                body = f.read()
+            return meta, body
+        except (OSError, ValueError):
+            return None, None # A corrupt entry just means a full re-fetch
+
+    def put_pending(self, url: str, etag: Optional[str], last_modified: Optional[str], body: str):
+        """Stores a freshly fetched response until `commit_pending_responses` promotes it."""
+        meta_path, body_path = self._paths(url, pending=True)
+        with open(body_path, "w", encoding="utf-8") as f:
+            f.write(body)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def discard_pending(self, url: str):
+        """Drops a pending entry left behind by an earlier run that never got indexed."""
+        for path in self._paths(url, pending=True):
+            if os.path.isfile(path):
+                os.remove(path)
+
+def commit_pending_responses(cache_dir: str) -> int:
+    """
+    Promotes pending responses to committed cache entries. Call only after the
+    documents loaded in this run were successfully added to the vector store.
+
+    Args:
+        cache_dir (str): The loader's cache directory.
+
+    Returns:
+        int: The number of committed responses.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    committed = 0
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".pending.json"):
+            continue
+        key = name[:-len(".pending.json")]
+        pending_body = os.path.join(cache_dir, f"{key}.pending.html")
+        if not os.path.isfile(pending_body):
+            continue
+        # Body first, then validators, so committed validators never point at an older body
+        os.replace(pending_body, os.path.join(cache_dir, f"{key}.html"))
+        os.replace(os.path.join(cache_dir, name), os.path.join(cache_dir, f"{key}.json"))
+        committed += 1
+    return committed
+
+class _HostRateLimiter:
+    """
+    Spaces out requests to the same host to at most `requests_per_second`.
+
+    Waiting and reserving are separate so a task can wait for its host without
+    holding a concurrency slot, then reserve the time slot only once it holds one.
+    All calls run on the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_allowed: Dict[str, float] = {}
+
+    def time_until_allowed(self, host: str) -> float:
+        """Seconds until the next request to `host` may start (0 if it may start now)."""
+        if not self.interval:
+            return 0.0
+        return max(0.0, self._next_allowed.get(host, 0.0) - asyncio.get_running_loop().time())
+
+    def try_reserve(self, host: str) -> bool:
+        """Claims the current time slot for `host`; False if another request took it first."""
+        if self.time_until_allowed(host) > 0:
+            return False
+        if self.interval:
+            self._next_allowed[host] = asyncio.get_running_loop().time() + self.interval
+        return True
+
+class CachedAsyncWebLoader(BaseLoader):
+    """
+    Loads web pages concurrently, honoring per-host rate limits and an on-disk
+    conditional-GET cache.
+
+    Pages are revalidated with If-None-Match/If-Modified-Since; a 304 response is
+    served from the cache, or skipped entirely when `skip_unchanged` is True (for
+    incremental ingests where the page is already in the vector store). New responses
+    only become revalidation candidates after `commit_pending_responses(cache_dir)`.
+    Pages are parsed in worker threads while other fetches continue, and documents
+    are yielded as soon as each page is parsed, in completion order.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        cache_dir: str = "./web_cache",
+        max_concurrency: int = 8,
+        requests_per_second_per_host: float = 2.0,
+        timeout: float = 30.0,
+        skip_unchanged: bool = False,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            urls (List[str]): The pages to load.
+            cache_dir (str): Directory for cached responses and their validators. Use one per
+                             vector store collection, outside the directory a full refresh clears,
+                             so unchanged pages can be served from the cache on the next ingest.
+            max_concurrency (int): Maximum number of requests in flight overall.
+            requests_per_second_per_host (float): Request rate limit per host (0 disables it).
+            timeout (float): Total timeout per request in seconds.
+            skip_unchanged (bool): If True, pages the server reports as unchanged
+                                   (HTTP 304) produce no document.
+            headers (Optional[Dict[str, str]]): Extra request headers.
+        """
+        self.urls = list(dict.fromkeys(urls)) # Drop repeated URLs, keep order
+        self.cache = _ResponseCache(cache_dir)
+        self.max_concurrency = max_concurrency
+        self.requests_per_second_per_host = requests_per_second_per_host
+        self.timeout = timeout
+        self.skip_unchanged = skip_unchanged
+        self.headers = headers or {}
+        self.stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Yields one Document per successfully loaded page while fetching continues in the background."""
+        self.stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+        results: queue.Queue = queue.Queue()
+
+        def run():
+            try:
+                asyncio.run(self._fetch_all(results))
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(_DONE)
+
+        worker = threading.Thread(target=run, name="web-loader", daemon=True)
+        worker.start()
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        worker.join()
+        print(f"  Website loading finished: {self.stats['fetched']} fetched, "
+              f"{self.stats['not_modified']} unchanged, {self.stats['failed']} failed.")
+
+    async def _fetch_all(self, results: queue.Queue):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        rate_limiter = _HostRateLimiter(self.requests_per_second_per_host)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout) as session:
+            tasks = [
+                asyncio.create_task(self._fetch(session, semaphore, rate_limiter, url))
+                for url in self.urls
+            ]
+            for task in asyncio.as_completed(tasks):
+                document = await task
+                if document is not None:
+                    results.put(document)
+
+    async def _fetch(
+        self,
+        session: "aiohttp.ClientSession",
+        semaphore: asyncio.Semaphore,
+        rate_limiter: _HostRateLimiter,
+        url: str
+    ) -> Optional[Document]:
+        self.cache.discard_pending(url) # Only responses fetched (and then indexed) in this run get committed
+        cached_meta, cached_body = self.cache.get(url)
+        request_headers = {}
+        if cached_meta:
+            if cached_meta.get("etag"):
+                request_headers["If-None-Match"] = cached_meta["etag"]
+            if cached_meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached_meta["last_modified"]
+
+        host = urlparse(url).netloc
+        try:
+            # Sleep on the host's rate limit without holding a concurrency slot, then reserve the
+            # time slot only after taking one, so the request goes out right after the reservation
+            while True:
+                delay = rate_limiter.time_until_allowed(host)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                await semaphore.acquire()
+                if rate_limiter.try_reserve(host):
+                    break
+                semaphore.release() # Another request to this host took the slot while we waited
+            try:
+                async with session.get(url, headers=request_headers) as response:
+                    if response.status == 304 and cached_body is not None:
+                        self.stats["not_modified"] += 1
+                        if self.skip_unchanged:
+                            return None
+                        body = cached_body
+                    elif response.status != 200:
+                        print(f"  Warning: '{url}' returned HTTP {response.status}. Skipping.")
+                        self.stats["failed"] += 1
+                        return None
+                    else:
+                        raw = await response.read()
+                        body = raw.decode(response.charset or "utf-8", errors="replace")
+                        self.cache.put_pending(
+                            url,
+                            etag=response.headers.get("ETag"),
+                            last_modified=response.headers.get("Last-Modified"),
+                            body=body
+                        )
+                        self.stats["fetched"] += 1
+            finally:
+                semaphore.release()
+        except Exception as e:
+            print(f"  Error loading website '{url}': {e}")
+            self.stats["failed"] += 1
+            return None
+        # Parse in a worker thread so the event loop keeps other fetches moving
+        return await asyncio.to_thread(self._parse, url, body)
+
+    @staticmethod
+    def _parse(url: str, html: str) -> Document:
+        """Extracts visible text and basic metadata, mirroring WebBaseLoader's output."""
+        soup = BeautifulSoup(html, "html.parser")
+        metadata = {"source": url}
+        if soup.title and soup.title.string:
+            metadata["title"] = soup.title.string.strip()
+        description = soup.find("meta", attrs={"name": "description"})
+        if description and description.get("content"):
+            metadata["description"] = description.get("content")
+        html_tag = soup.find("html")
+        if html_tag and html_tag.get("lang"):
+            metadata["language"] = html_tag.get("lang")
+        return Document(page_content=soup.get_text(), metadata=metadata)
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    # Serves fixture pages from a temporary directory on a local HTTP server.
+    # SimpleHTTPRequestHandler sends Last-Modified and answers If-Modified-Since with 304,
+    # so the second load should report every page as unchanged.
+    import functools
+    import shutil
+    import tempfile
+    from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+    fixture_dir = tempfile.mkdtemp(prefix="web_fixtures_")
+    cache_dir = tempfile.mkdtemp(prefix="web_cache_")
+    for i in range(5):
+        with open(os.path.join(fixture_dir, f"page{i}.html"), "w") as f:
+            f.write(f"<html lang='en'><head><title>Page {i}</title></head>"
+                    f"<body><p>Fixture page number {i}.</p></body></html>")
+
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=fixture_dir)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    fixture_urls = [f"{base_url}/page{i}.html" for i in range(5)] + [f"{base_url}/missing.html"]
+
+    try:
+        print("First load (cold cache):")
+        loader = CachedAsyncWebLoader(fixture_urls, cache_dir=cache_dir, requests_per_second_per_host=0)
+        documents = list(loader.lazy_load())
+        for doc in documents:
+            print(f"  {doc.metadata['source']}: {doc.page_content.strip()}")
+        assert len(documents) == 5
+        assert loader.stats == {"fetched": 5, "not_modified": 0, "failed": 1}
+        assert commit_pending_responses(cache_dir) == 5 # As prep-data.py does after indexing
+
+        print("\nSecond load (incremental: unchanged pages are skipped):")
+        loader = CachedAsyncWebLoader(fixture_urls, cache_dir=cache_dir, requests_per_second_per_host=0, skip_unchanged=True)
+        documents = loader.load()
+        assert len(documents) == 0
+        assert loader.stats == {"fetched": 0, "not_modified": 5, "failed": 1}
+
+        print("\nThird load (full refresh: unchanged pages come from the cached body):")
+        for i in range(5): # Mark the cached bodies so the documents prove where they came from
+            cached_path = os.path.join(cache_dir, hashlib.sha256(fixture_urls[i].encode("utf-8")).hexdigest() + ".html")
+            with open(cached_path, "r", encoding="utf-8") as f:
+                cached_html = f.read()
+            with open(cached_path, "w", encoding="utf-8") as f:
+                f.write(cached_html.replace(f"<title>Page {i}", f"<title>Cached page {i}"))
+        loader = CachedAsyncWebLoader(fixture_urls, cache_dir=cache_dir, requests_per_second_per_host=0)
+        documents = loader.load()
+        assert len(documents) == 5
+        assert loader.stats == {"fetched": 0, "not_modified": 5, "failed": 1}
+        assert sorted(doc.metadata["title"] for doc in documents) == [f"Cached page {i}" for i in range(5)]
+
+        print("\nRate limit (1 request/s per host, slots released while waiting):")
+        loader = CachedAsyncWebLoader(fixture_urls[:3], cache_dir=tempfile.mkdtemp(dir=cache_dir),
+                                      max_concurrency=2, requests_per_second_per_host=1.0)
+        started = time.monotonic()
+        assert len(loader.load()) == 3
+        elapsed = time.monotonic() - started
+        print(f"  3 requests took {elapsed:.2f}s")
+        assert elapsed >= 2.0 # Requests at t=0, 1 and 2 s
+        print("\nAll fixture checks passed.")
+    finally:
+        server.shutdown()
+        shutil.rmtree(fixture_dir)
+        shutil.rmtree(cache_dir)